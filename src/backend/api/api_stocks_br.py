@@ -1,21 +1,46 @@
 import os
-from fastapi import FastAPI, HTTPException
-from google.cloud import bigquery
-from google.oauth2 import service_account
-import pandas as pd
-from typing import List, Dict
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional
+from replica_store import ReplicaStore, ReplicaNotAvailable
+from intraday_stream import IntradayStream, criar_fonte
 
-app = FastAPI()
+# Streaming intraday (ativado com INTRADAY_SOURCE=simulador ou o caminho de um CSV de replay)
+intraday = None
 
-# Configuração da autenticação do GCP
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credentials/credentials_private_key_gbq/GBQ.json"
-credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global intraday
+    tarefa = None
+    fonte_configurada = os.getenv("INTRADAY_SOURCE")
+    if fonte_configurada:
+        intraday = IntradayStream(criar_fonte(fonte_configurada))
+        tarefa = asyncio.create_task(intraday.run())
+    yield
+    if tarefa is not None:
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
 
-def load_from_bigquery(query: str, credentials_path: str) -> pd.DataFrame:
-    """Carrega dados do BigQuery usando uma consulta SQL."""
-    credentials = service_account.Credentials.from_service_account_file(credentials_path)
-    client = bigquery.Client(credentials=credentials, project=credentials.project_id)
-    return client.query(query).to_dataframe()
+app = FastAPI(lifespan=lifespan)
+
+# Histórico completo: transmitido em lotes de linhas; com limit, devolvido em páginas
+HISTORICAL_BATCH_SIZE = 10000
+HISTORICAL_MAX_PAGE_SIZE = 100000
+
+# Réplica local de leitura publicada pelo pipeline (nenhuma consulta ao BigQuery por requisição)
+replica = ReplicaStore()
+
+def read_replica(table_name: str, index_column: Optional[str] = None, sort_column: Optional[str] = None):
+    """Obtém o snapshot atual de uma tabela da réplica local."""
+    try:
+        return replica.get(table_name, index_column=index_column, sort_column=sort_column)
+    except ReplicaNotAvailable:
+        raise HTTPException(status_code=503, detail=f"Tabela {table_name} ainda não publicada na réplica local")
 
 @app.get("/")
 def read_root():
@@ -24,36 +49,95 @@ def read_root():
 @app.get("/silver_wallet_br", response_model=List[Dict])
 def get_silver_wallet_br():
     try:
-        query = """
-        SELECT * FROM `fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_wallet_br`
-        """
-        df = load_from_bigquery(query, credentials_path)
-        return df.to_dict(orient="records")
+        return read_replica("silver_wallet_br").records()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def stream_records(table, offset=0):
+    """Transmite as linhas como um array JSON, convertendo um lote da tabela Arrow por vez."""
+    yield "["
+    primeiro = True
+    for batch in table.iter_records(offset, HISTORICAL_BATCH_SIZE):
+        if batch:
+            corpo = json.dumps(jsonable_encoder(batch), ensure_ascii=False, allow_nan=False)[1:-1]
+            yield corpo if primeiro else "," + corpo
+            primeiro = False
+    yield "]"
+
 @app.get("/silver_historical_stock_price_br", response_model=List[Dict])
-def get_silver_historical_stock_price_br():
+def get_silver_historical_stock_price_br(response: Response, offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1, le=HISTORICAL_MAX_PAGE_SIZE)):
+    """Histórico completo (ou a partir de offset); com limit, devolve uma página.
+
+    X-Total-Count informa o total de linhas e X-Next-Offset, quando presente, o início da próxima página.
+    """
     try:
-        query = """
-        SELECT * FROM `fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_historical_stock_price_br`
-        """
-        df = load_from_bigquery(query, credentials_path)
-        return df.to_dict(orient="records")
+        table = read_replica("silver_historical_stock_price_br", index_column="ticker", sort_column="data")
+        headers = {"X-Total-Count": str(table.table.num_rows)}
+        if limit is None:
+            return StreamingResponse(stream_records(table, offset), media_type="application/json", headers=headers)
+        if offset + limit < table.table.num_rows:
+            headers["X-Next-Offset"] = str(offset + limit)
+        response.headers.update(headers)
+        return table.records(offset, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/silver_historical_stock_price_br/{ticker}", response_model=List[Dict])
+def get_silver_historical_stock_price_br_ticker(ticker: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    try:
+        table = read_replica("silver_historical_stock_price_br", index_column="ticker", sort_column="data")
+        return table.lookup(ticker, start_date, end_date)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/silver_address_company_br", response_model=List[Dict])
 def get_silver_address_company_br():
     try:
-        query = """
-        SELECT * FROM `fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_address_company_br`
-        """
-        df = load_from_bigquery(query, credentials_path)
-        return df.to_dict(orient="records")
+        return read_replica("silver_address_company_br").records()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def get_intraday():
+    if intraday is None:
+        raise HTTPException(status_code=503, detail="Streaming intraday desativado. Defina INTRADAY_SOURCE para ativá-lo")
+    return intraday
+
+# async: roda no loop de eventos, sem disputar as barras com o stream a partir do threadpool
+@app.get("/intraday_bars", response_model=List[Dict])
+async def get_intraday_bars(ticker: Optional[str] = None):
+    return get_intraday().barras_abertas(ticker)
+
+@app.get("/stream/intraday_bars")
+async def stream_intraday_bars(request: Request, ticker: Optional[str] = None, intervalo: Optional[str] = None):
+    """Publica as atualizações das barras intraday via Server-Sent Events."""
+    stream = get_intraday()
+    fila = stream.assinar()
+
+    async def eventos():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    barras = await asyncio.wait_for(fila.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                barras = [barra for barra in barras
+                          if (ticker is None or barra['ticker'] == ticker) and (intervalo is None or barra['interval'] == intervalo)]
+                if barras:
+                    yield f"data: {json.dumps(barras)}\n\n"
+        finally:
+            stream.cancelar(fila)
+
+    return StreamingResponse(eventos(), media_type="text/event-stream")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,318 @@
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+import pandas as pd
+
+# Streaming intraday: ingere ticks de uma fonte plugável, monta barras OHLCV incrementalmente
+# em memória, grava as barras fechadas na camada raw em micro-lotes e publica as atualizações
+# para os assinantes (endpoint SSE da API).
+
+Tick = namedtuple('Tick', ['ticker', 'timestamp', 'price', 'volume'])
+
+# Intervalos das barras em segundos
+INTERVALOS = {'1m': 60, '5m': 300, '1d': 86400}
+
+# Deslocamento do horário da B3 em relação ao UTC (as barras diárias fecham à meia-noite de Brasília)
+FUSO_B3 = -3 * 3600
+
+# Caminho da camada raw para as barras intraday
+raw_directory = os.path.join(os.getcwd(), 'src', 'backend', 'data', '1_raw')
+intraday_path = os.path.join(raw_directory, 'raw_intraday_stock_price_br.csv')
+wallet_path = os.path.join(raw_directory, 'raw_wallet_br.csv')
+colunas_barra = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'ticker', 'interval']
+
+
+class SimulatorSource:
+    """Fonte de ticks simulados (passeio aleatório) para testes locais."""
+
+    def __init__(self, tickers, ticks_por_segundo=1000, duracao=None, seed=None):
+        self.tickers = list(tickers)
+        self.ticks_por_segundo = ticks_por_segundo
+        self.duracao = duracao
+        self.random = random.Random(seed)
+
+    def agora(self):
+        """Relógio da fonte: os ticks simulados usam o horário real."""
+        return time.time()
+
+    async def ticks(self):
+        precos = {ticker: 10 + 90 * self.random.random() for ticker in self.tickers}
+        inicio = time.monotonic()
+        emitidos = 0
+        while self.duracao is None or time.monotonic() - inicio < self.duracao:
+            # Emite em rajadas para manter a taxa alvo sem dormir a cada tick
+            devidos = int((time.monotonic() - inicio) * self.ticks_por_segundo) - emitidos
+            for _ in range(devidos):
+                ticker = self.random.choice(self.tickers)
+                precos[ticker] *= math.exp(self.random.gauss(0, 0.0005))
+                yield Tick(ticker, time.time(), round(precos[ticker], 2), self.random.randint(1, 10) * 100)
+            emitidos += max(devidos, 0)
+            await asyncio.sleep(0.005)
+
+
+class ReplaySource:
+    """Fonte que reproduz ticks gravados em CSV (colunas ticker, timestamp, price, volume).
+
+    velocidade=1 reproduz no ritmo original; velocidade=0 reproduz o mais rápido possível.
+    """
+
+    def __init__(self, caminho, velocidade=1.0):
+        self.caminho = caminho
+        self.velocidade = velocidade
+        self._primeiro = None
+        self._inicio = None
+        self._ultimo = None
+
+    def agora(self):
+        """Relógio da fonte no tempo da gravação (None antes do primeiro tick)."""
+        if self.velocidade and self._primeiro is not None:
+            return self._primeiro + (time.monotonic() - self._inicio) * self.velocidade
+        return self._ultimo
+
+    async def ticks(self):
+        df = pd.read_csv(self.caminho).sort_values('timestamp', kind='mergesort')
+        for ticker, timestamp, price, volume in df[['ticker', 'timestamp', 'price', 'volume']].itertuples(index=False):
+            if self._primeiro is None:
+                self._primeiro = float(timestamp)
+                self._inicio = time.monotonic()
+            if self.velocidade:
+                espera = (timestamp - self._primeiro) / self.velocidade - (time.monotonic() - self._inicio)
+                if espera > 0:
+                    await asyncio.sleep(espera)
+            self._ultimo = float(timestamp)
+            yield Tick(ticker, float(timestamp), float(price), int(volume))
+
+
+class BarBuilder:
+    """Mantém as barras abertas de cada (ticker, intervalo) e as atualiza a cada tick."""
+
+    def __init__(self, intervalos=INTERVALOS, fuso=FUSO_B3):
+        self.intervalos = intervalos
+        self.fuso = fuso
+        self.abertas = {}  # (ticker, intervalo) -> [inicio, abertura, maxima, minima, fechamento, volume]
+        self.marcas = {}  # ticker -> instante a partir do qual novos ticks são aceitos
+        self.ticks_atrasados = 0
+
+    def atualizar(self, tick):
+        """Aplica o tick; retorna as chaves atualizadas e as barras que fecharam."""
+        if tick.timestamp < self.marcas.get(tick.ticker, float('-inf')):
+            # Tick fora de ordem ou de um período já fechado: descartado em todos os intervalos
+            self.ticks_atrasados += 1
+            return [], []
+        self.marcas[tick.ticker] = tick.timestamp
+
+        atualizadas = []
+        fechadas = []
+        for nome, segundos in self.intervalos.items():
+            inicio = (tick.timestamp + self.fuso) // segundos * segundos - self.fuso
+            chave = (tick.ticker, nome)
+            barra = self.abertas.get(chave)
+            if barra is None or inicio > barra[0]:
+                if barra is not None:
+                    fechadas.append((chave, barra))
+                self.abertas[chave] = [inicio, tick.price, tick.price, tick.price, tick.price, tick.volume]
+            else:
+                if tick.price > barra[2]:
+                    barra[2] = tick.price
+                if tick.price < barra[3]:
+                    barra[3] = tick.price
+                barra[4] = tick.price
+                barra[5] += tick.volume
+            atualizadas.append(chave)
+        return atualizadas, fechadas
+
+    def fechar_vencidas(self, agora):
+        """Fecha as barras cujo período terminou até o instante agora, mesmo sem novos ticks."""
+        fechadas = []
+        for chave, barra in list(self.abertas.items()):
+            fim = barra[0] + self.intervalos[chave[1]]
+            if fim <= agora:
+                fechadas.append((chave, self.abertas.pop(chave)))
+                # Ticks do período fechado passam a ser atrasados
+                if fim > self.marcas.get(chave[0], float('-inf')):
+                    self.marcas[chave[0]] = fim
+        return fechadas
+
+
+def barra_para_dict(chave, barra):
+    ticker, intervalo = chave
+    return {
+        'Date': datetime.fromtimestamp(barra[0], tz=timezone.utc).isoformat(),
+        'Open': barra[1],
+        'High': barra[2],
+        'Low': barra[3],
+        'Close': barra[4],
+        'Volume': barra[5],
+        'ticker': ticker,
+        'interval': intervalo,
+    }
+
+
+class IntradayStream:
+    """Orquestra a ingestão de ticks, a gravação em micro-lotes e a publicação das barras."""
+
+    def __init__(self, source, builder=None, caminho_raw=intraday_path, tamanho_lote=5000,
+                 intervalo_flush=5.0, intervalo_push=0.25, tamanho_fila=100):
+        self.source = source
+        self.builder = builder or BarBuilder()
+        self.caminho_raw = caminho_raw
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.intervalo_push = intervalo_push
+        self.tamanho_fila = tamanho_fila
+
+        self.pendentes = []  # barras fechadas aguardando gravação
+        self.sujas = {}  # chave -> instante da primeira atualização ainda não publicada
+        self.fechadas_a_publicar = []  # estado final das barras que fecharam desde a última publicação
+        self.assinantes = set()
+        self.ticks_processados = 0
+        self.barras_gravadas = 0
+        self.latencias = deque(maxlen=100000)  # segundos entre o tick e a publicação da barra
+        self._evento_flush = asyncio.Event()
+        self._encerrando = False
+        # Relógio usado para fechar barras sem novos ticks (tempo da gravação no replay)
+        self.relogio = getattr(source, 'agora', time.time)
+
+    def assinar(self):
+        fila = asyncio.Queue(maxsize=self.tamanho_fila)
+        self.assinantes.add(fila)
+        return fila
+
+    def cancelar(self, fila):
+        self.assinantes.discard(fila)
+
+    def barras_abertas(self, ticker=None):
+        return [barra_para_dict(chave, barra) for chave, barra in self.builder.abertas.items()
+                if ticker is None or chave[0] == ticker]
+
+    async def _consumir(self):
+        agora = time.monotonic
+        async for tick in self.source.ticks():
+            atualizadas, fechadas = self.builder.atualizar(tick)
+            instante = agora()
+            for chave in atualizadas:
+                self.sujas.setdefault(chave, instante)
+            if fechadas:
+                self._registrar_fechadas(fechadas)
+            self.ticks_processados += 1
+            if self.ticks_processados % 1000 == 0:
+                # Devolve o controle ao loop para publicação e gravação mesmo com fontes sem espera
+                await asyncio.sleep(0)
+
+    def _registrar_fechadas(self, fechadas):
+        fechadas = [barra_para_dict(chave, barra) for chave, barra in fechadas]
+        self.pendentes.extend(fechadas)
+        self.fechadas_a_publicar.extend(fechadas)
+        if len(self.pendentes) >= self.tamanho_lote:
+            self._evento_flush.set()
+
+    def _fechar_vencidas(self):
+        agora = self.relogio()
+        if agora is None:
+            return
+        fechadas = self.builder.fechar_vencidas(agora)
+        if fechadas:
+            self._registrar_fechadas(fechadas)
+
+    def _publicar(self):
+        if not self.sujas and not self.fechadas_a_publicar:
+            return
+        sujas, self.sujas = self.sujas, {}
+        barras, self.fechadas_a_publicar = self.fechadas_a_publicar, []
+        agora = time.monotonic()
+        abertas = self.builder.abertas
+        barras.extend(barra_para_dict(chave, abertas[chave]) for chave in sujas if chave in abertas)
+        self.latencias.extend(agora - instante for instante in sujas.values())
+        for fila in list(self.assinantes):
+            if fila.full():
+                # Assinante lento: descarta a atualização mais antiga para manter a latência limitada
+                fila.get_nowait()
+            fila.put_nowait(barras)
+
+    async def _loop_publicacao(self):
+        while True:
+            await asyncio.sleep(self.intervalo_push)
+            self._fechar_vencidas()
+            self._publicar()
+
+    async def _gravar(self):
+        if not self.pendentes:
+            return
+        lote, self.pendentes = self.pendentes, []
+        df = pd.DataFrame(lote, columns=colunas_barra)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho_raw)), exist_ok=True)
+            cabecalho = not os.path.exists(self.caminho_raw)
+            await asyncio.to_thread(df.to_csv, self.caminho_raw, mode='a', header=cabecalho, index=False)
+            self.barras_gravadas += len(lote)
+        except Exception as e:
+            # Mantém o lote para a próxima tentativa
+            print(f"Erro ao gravar barras intraday em {self.caminho_raw}: {e}")
+            self.pendentes = lote + self.pendentes
+
+    async def _loop_gravacao(self):
+        # Não é cancelado: encerra após a última gravação para não deixar escrita pela metade
+        while not self._encerrando:
+            try:
+                await asyncio.wait_for(self._evento_flush.wait(), timeout=self.intervalo_flush)
+            except asyncio.TimeoutError:
+                pass
+            self._evento_flush.clear()
+            await self._gravar()
+
+    async def run(self):
+        """Processa a fonte até o fim (ou cancelamento), gravando e publicando as barras fechadas.
+
+        Barras ainda abertas no encerramento não são gravadas na camada raw, pois estão incompletas.
+        """
+        publicacao = asyncio.create_task(self._loop_publicacao())
+        gravacao = asyncio.create_task(self._loop_gravacao())
+        try:
+            await self._consumir()
+        finally:
+            publicacao.cancel()
+            await asyncio.gather(publicacao, return_exceptions=True)
+            self._fechar_vencidas()
+            self._publicar()
+            self._encerrando = True
+            self._evento_flush.set()
+            await asyncio.gather(gravacao, return_exceptions=True)
+            await self._gravar()
+
+
+def criar_fonte(configuracao):
+    """Cria a fonte de ticks a partir da configuração ('simulador' ou caminho de um CSV de replay)."""
+    if configuracao == 'simulador':
+        tickers = pd.read_csv(wallet_path)['ticker_br'].tolist() if os.path.exists(wallet_path) else [f'TICK{i}.SA' for i in range(500)]
+        return SimulatorSource(tickers, ticks_por_segundo=int(os.getenv('INTRADAY_TICKS_PER_SECOND', '1000')))
+    return ReplaySource(configuracao, velocidade=float(os.getenv('INTRADAY_REPLAY_SPEED', '1')))
+
+
+async def medir_desempenho(ticks_por_segundo=5000, duracao=10, caminho_raw='bench_intraday.csv'):
+    """Roda o simulador e mede a vazão e a latência tick -> publicação da barra."""
+    tickers = [f'TICK{i}.SA' for i in range(500)]
+    fonte = SimulatorSource(tickers, ticks_por_segundo=ticks_por_segundo, duracao=duracao, seed=42)
+    stream = IntradayStream(fonte, caminho_raw=caminho_raw)
+    stream.assinar()
+    start_time = time.time()
+    await stream.run()
+    end_time = time.time()
+    latencias = sorted(stream.latencias)
+    print(f"Ticks processados: {stream.ticks_processados} em {end_time - start_time:.2f} segundos "
+          f"({stream.ticks_processados / (end_time - start_time):.0f} ticks/s)")
+    if latencias:
+        print(f"Latência tick -> barra publicada: p50 {latencias[len(latencias) // 2] * 1000:.1f} ms, "
+              f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.1f} ms")
+    print(f"Barras gravadas na camada raw: {stream.barras_gravadas}")
+    if os.path.exists(caminho_raw):
+        os.remove(caminho_raw)
+
+
+if __name__ == "__main__":
+    taxa = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    asyncio.run(medir_desempenho(ticks_por_segundo=taxa))
@@ -1,6 +1,12 @@
 import os
+import re
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Carregar as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -8,21 +14,121 @@ load_dotenv()
 # Configurar a chave da API do OpenAI
 api_key = os.getenv("OPENAI_API_KEY")
 
+# URL base da API (pode apontar para o servidor stub local em testes offline)
+base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Configurações do cliente
+MODEL = "gpt-4"
+SYSTEM_PROMPT = "You are a helpful assistant."
+TIMEOUT = (5, 60)  # (conexão, leitura) em segundos
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 10
+CACHE_MAX_SIZE = 1024
+CACHE_TTL = 60 * 60  # 1 hora
+
+
+def normalizar_pergunta(pergunta):
+    """Normaliza a pergunta para a chave do cache (espaços em excesso não geram nova consulta)."""
+    return re.sub(r'\s+', ' ', pergunta).strip()
+
+
+class ChatGPTClient:
+    """Cliente do ChatGPT com sessão HTTP persistente, cache de respostas e retentativas."""
+
+    def __init__(self, api_key=api_key, base_url=base_url, model=MODEL, timeout=TIMEOUT,
+                 pool_size=POOL_SIZE, cache_max_size=CACHE_MAX_SIZE, cache_ttl=CACHE_TTL):
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.model = model
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        # Sessão com pool de conexões e backoff exponencial para erros de conexão e 429/5xx.
+        # read=0: um timeout de leitura não reenvia a requisição (a geração já pode ter sido cobrada)
+        retry = Retry(total=MAX_RETRIES, read=0, backoff_factor=BACKOFF_FACTOR,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["POST"]), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        })
+
+        self.cache = TTLCache(maxsize=cache_max_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+
+    def _chave_cache(self, pergunta):
+        return (self.model, SYSTEM_PROMPT, normalizar_pergunta(pergunta))
+
+    def perguntar(self, pergunta):
+        """Envia a pergunta ao modelo, reutilizando a resposta em cache quando houver."""
+        chave = self._chave_cache(pergunta)
+        with self._cache_lock:
+            resposta = self.cache.get(chave)
+        if resposta is not None:
+            return resposta
+
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": pergunta}
+            ]
+        }
+        response = self.session.post(self.url, json=data, timeout=self.timeout)
+        response.raise_for_status()
+        resposta = response.json()["choices"][0]["message"]["content"].strip()
+
+        with self._cache_lock:
+            self.cache[chave] = resposta
+        return resposta
+
+    def perguntar_lote(self, perguntas, max_concorrencia=None):
+        """Envia várias perguntas em paralelo, limitado a max_concorrencia requisições simultâneas."""
+        max_concorrencia = max_concorrencia or self.pool_size
+        # Perguntas equivalentes são enviadas uma única vez, com o texto original da primeira ocorrência
+        unicas = {}
+        for pergunta in perguntas:
+            unicas.setdefault(normalizar_pergunta(pergunta), pergunta)
+
+        def consultar(pergunta):
+            try:
+                return self.perguntar(pergunta)
+            except Exception as e:
+                return f"Erro ao consultar o ChatGPT: {e}"
+
+        with ThreadPoolExecutor(max_workers=max_concorrencia) as executor:
+            respostas = dict(zip(unicas, executor.map(consultar, unicas.values())))
+        return [respostas[normalizar_pergunta(p)] for p in perguntas]
+
+    def limpar_cache(self):
+        with self._cache_lock:
+            self.cache.clear()
+
+
+# Cliente compartilhado pelo módulo
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ChatGPTClient()
+    return _client
+
 def consultar_chatgpt(pergunta):
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
-    }
-    data = {
-        "model": "gpt-4",
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": pergunta}
-        ]
-    }
     try:
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"].strip()
+        return get_client().perguntar(pergunta)
     except Exception as e:
         return f"Erro ao consultar o ChatGPT: {e}"
+
+def consultar_chatgpt_tickers(tickers, modelo_pergunta, max_concorrencia=None):
+    """Faz a mesma pergunta (modelo com {ticker}) para vários tickers com concorrência limitada."""
+    perguntas = [modelo_pergunta.format(ticker=ticker) for ticker in tickers]
+    respostas = get_client().perguntar_lote(perguntas, max_concorrencia=max_concorrencia)
+    return dict(zip(tickers, respostas))
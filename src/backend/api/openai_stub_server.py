@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor local que imita o endpoint /v1/chat/completions do OpenAI para testes offline.
+# Uso:
+#   python src/backend/api/openai_stub_server.py           -> sobe o servidor em 127.0.0.1:8001
+#   python src/backend/api/openai_stub_server.py --bench   -> sobe o servidor e mede o throughput do cliente
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv("OPENAI_STUB_PORT", "8001"))
+LATENCIA = float(os.getenv("OPENAI_STUB_LATENCY", "0.5"))  # segundos simulados por resposta
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    total_requisicoes = 0
+    em_andamento = 0
+    pico_concorrencia = 0  # maior número de requisições atendidas ao mesmo tempo
+    _lock = threading.Lock()
+
+    def do_POST(self):
+        if self.path.rstrip('/') != "/v1/chat/completions":
+            self.send_error(404)
+            return
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        with StubHandler._lock:
+            StubHandler.total_requisicoes += 1
+            StubHandler.em_andamento += 1
+            StubHandler.pico_concorrencia = max(StubHandler.pico_concorrencia, StubHandler.em_andamento)
+        try:
+            time.sleep(LATENCIA)
+        finally:
+            with StubHandler._lock:
+                StubHandler.em_andamento -= 1
+        pergunta = corpo.get("messages", [{}])[-1].get("content", "")
+        resposta = json.dumps({
+            "model": corpo.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"Resposta stub para: {pergunta}"}}]
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(resposta)))
+        self.end_headers()
+        try:
+            self.wfile.write(resposta)
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente desistiu (timeout de leitura) antes da resposta
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def iniciar_servidor(host=HOST, port=PORT):
+    """Inicia o servidor stub em uma thread e retorna a instância."""
+    servidor = ThreadingHTTPServer((host, port), StubHandler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+def medir_throughput(quantidade_tickers=50, max_concorrencia=10):
+    """Mede o tempo do lote sem cache e com cache contra o servidor stub."""
+    from openai_api import ChatGPTClient
+
+    servidor = iniciar_servidor()
+    cliente = ChatGPTClient(api_key="stub", base_url=f"http://{HOST}:{PORT}/v1")
+    perguntas = [f"Resuma o desempenho recente da ação TCKR{i}.SA" for i in range(quantidade_tickers)]
+
+    start_time = time.time()
+    cliente.perguntar_lote(perguntas, max_concorrencia=max_concorrencia)
+    tempo_sem_cache = time.time() - start_time
+
+    start_time = time.time()
+    cliente.perguntar_lote(perguntas, max_concorrencia=max_concorrencia)
+    tempo_com_cache = time.time() - start_time
+
+    print(f"{quantidade_tickers} perguntas, concorrência {max_concorrencia}, latência simulada {LATENCIA:.2f}s")
+    print(f"Lote sem cache: {tempo_sem_cache:.2f} segundos")
+    print(f"Lote com cache: {tempo_com_cache:.4f} segundos")
+    print(f"Requisições recebidas pelo stub: {StubHandler.total_requisicoes} (pico de {StubHandler.pico_concorrencia} simultâneas)")
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        medir_throughput()
+    else:
+        print(f"Servidor stub do OpenAI em http://{HOST}:{PORT}/v1")
+        ThreadingHTTPServer((HOST, PORT), StubHandler).serve_forever()
@@ -0,0 +1,99 @@
+import os
+import threading
+import numpy as np
+import pyarrow as pa
+
+# Diretório da réplica local de leitura (arquivos Arrow publicados pelo pipeline)
+replica_directory = os.path.join(os.getcwd(), 'src', 'backend', 'data', 'replica')
+
+
+def publish_table(dataframe, table_name, sort_columns=None, directory=replica_directory):
+    """Publica o DataFrame na réplica local (Arrow IPC) com troca atômica do arquivo."""
+    os.makedirs(directory, exist_ok=True)
+    if sort_columns:
+        # ReplicaTable monta o índice por chave assumindo a tabela ordenada por estas colunas
+        dataframe = dataframe.sort_values(sort_columns, kind='mergesort').reset_index(drop=True)
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    final_path = os.path.join(directory, f"{table_name}.arrow")
+    tmp_path = f"{final_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, final_path)
+    print(f"Réplica {table_name} publicada em {final_path}")
+
+
+class ReplicaNotAvailable(Exception):
+    """Tabela ainda não publicada na réplica local."""
+
+
+class ReplicaTable:
+    """Snapshot imutável de uma tabela da réplica, mapeado em memória."""
+
+    def __init__(self, path, version, index_column=None, sort_column=None):
+        self.path = path
+        self.version = version
+        self.table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        self.index_column = index_column
+        self.sort_column = sort_column
+        self.index = self._build_index() if index_column else {}
+
+    def _build_index(self):
+        """Monta o índice chave -> (início, fim) sobre a tabela já ordenada pela chave."""
+        keys = self.table.column(self.index_column).to_numpy(zero_copy_only=False)
+        if len(keys) == 0:
+            return {}
+        changes = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = np.concatenate(([0], changes))
+        stops = np.concatenate((changes, [len(keys)]))
+        return {keys[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+    def records(self, offset=0, limit=None):
+        """Converte para dicionários apenas as linhas pedidas, sem manter cópia em memória."""
+        return self.table.slice(offset, limit).to_pylist()
+
+    def iter_records(self, offset=0, batch_size=10000):
+        """Gera as linhas a partir de offset em lotes de dicionários, um lote convertido por vez."""
+        for batch in self.table.slice(offset).to_batches(max_chunksize=batch_size):
+            yield batch.to_pylist()
+
+    def lookup(self, key, start=None, end=None):
+        """Retorna as linhas de uma chave, opcionalmente restritas ao intervalo [start, end]."""
+        if key not in self.index:
+            return []
+        first, last = self.index[key]
+        rows = self.table.slice(first, last - first)
+        if self.sort_column and (start is not None or end is not None):
+            values = rows.column(self.sort_column).to_numpy(zero_copy_only=False)
+            lo = 0 if start is None else int(np.searchsorted(values, np.datetime64(start), side='left'))
+            hi = len(values) if end is None else int(np.searchsorted(values, np.datetime64(end, 'D') + np.timedelta64(1, 'D'), side='left'))
+            rows = rows.slice(lo, max(hi - lo, 0))
+        return rows.to_pylist()
+
+
+class ReplicaStore:
+    """Réplica local de leitura: recarrega cada tabela quando o pipeline publica uma nova versão."""
+
+    def __init__(self, directory=replica_directory):
+        self.directory = directory
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, table_name, index_column=None, sort_column=None):
+        path = os.path.join(self.directory, f"{table_name}.arrow")
+        try:
+            version = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise ReplicaNotAvailable(table_name)
+
+        current = self._tables.get(table_name)
+        if current is not None and current.version == version:
+            return current
+
+        with self._lock:
+            current = self._tables.get(table_name)
+            if current is None or current.version != version:
+                # O arquivo é substituído via os.replace, então o snapshot aberto continua válido
+                current = ReplicaTable(path, version, index_column, sort_column)
+                self._tables[table_name] = current
+        return current
@@ -1,5 +1,9 @@
 import os
+import re
+import json
 import time
+import hashlib
+import numpy as np
 import pandas as pd
 import investpy as inv
 import yfinance as yf
@@ -18,6 +22,7 @@ output_directory = os.path.join(os.getcwd(), 'src', 'backend', 'data', '1_raw')
 wallet_br_path = os.path.join(output_directory, 'raw_wallet_br.csv')
 address_path = os.path.join(output_directory, 'raw_address_company_br.csv')
 historical_stock_price_br_path = os.path.join(output_directory, 'raw_historical_stock_price_br.csv')
+enrichment_cache_path = os.path.join(output_directory, 'cache_enriched_wallet_br.parquet')
 
 
 def persist_to_bigquery(df, table_id, credentials_path):
@@ -118,62 +123,135 @@ def get_stock_info_parallelized(tickers):
     print(f"Tempo total de execução: {end_time - start_time:.2f} segundos")
     return pd.DataFrame(data)
 
-def merge_stock_info(wallet_df, stock_info_df):
+# Classe de listagem pelo sufixo numérico do símbolo (ex.: PETR4 -> '4')
+SYMBOL_SUFFIX_PATTERN = re.compile(r'(\d+)$')
+CLASS_EXCHANGE_BY_SUFFIX = {
+    '3': 'Ações Ordinárias',
+    '4': 'Ações Preferenciais',
+    '5': 'Ações Preferenciais Classe A',
+    '6': 'Ações Preferenciais Classe B',
+    '7': 'Ações Preferenciais Classe C',
+    '8': 'Ações Preferenciais Classe D',
+    '11': 'Units (Pacote de valores mobiliários)',
+    '12': 'Ações Preferenciais Classe E',
+    '13': 'Ações Preferenciais Classe F',
+    '31': 'Ações Ordinárias Resgatáveis',
+    '32': 'Ações Preferenciais Resgatáveis',
+    '33': 'Ações Preferenciais Classe A Resgatáveis',
+    '34': 'Ações Preferenciais Classe B Resgatáveis',
+    '35': 'Ações Preferenciais Classe C Resgatáveis',
+    '36': 'Ações Preferenciais Classe D Resgatáveis',
+    '39': 'Ações Preferenciais de Dividendos Prioritários Resgatáveis',
+    '41': 'Ações Ordinárias Não Conversíveis',
+    '42': 'Ações Preferenciais Não Conversíveis',
+    '43': 'Ações Preferenciais Classe A Não Conversíveis',
+    '44': 'Ações Preferenciais Classe B Não Conversíveis',
+    '45': 'Ações Preferenciais Classe C Não Conversíveis',
+    '46': 'Ações Preferenciais Classe D Não Conversíveis',
+    '49': 'Ações Preferenciais de Dividendos Prioritários Não Conversíveis',
+    '50': 'Ações Ordinárias com Direitos Diferenciados',
+    '51': 'Ações Preferenciais com Direitos Diferenciados',
+    '52': 'Ações Preferenciais Classe A com Direitos Diferenciados',
+    '53': 'Ações Preferenciais Classe B com Direitos Diferenciados',
+    '54': 'Ações Preferenciais Classe C com Direitos Diferenciados',
+    '55': 'Ações Preferenciais Classe D com Direitos Diferenciados',
+    '56': 'Ações Preferenciais Diferenciadas de Dividendos Prioritários'
+}
+
+# Versão da lógica de enriquecimento: incremente ao alterar map_class_exchange ou enrich_wallet_rows
+ENRICHMENT_VERSION = 1
+
+# Colunas de origem do enriquecimento: uma linha só é reprocessada quando alguma delas muda
+ENRICHMENT_SOURCE_COLUMNS = ['name', 'full_name', 'symbol', 'ticker_br', 'snome', 'sector', 'industry']
+ENRICHMENT_FINAL_COLUMNS = ['country', 'name', 'full_name', 'symbol', 'ticker_br', 'snome', 'sector', 'industry', 'class_exchange', 'research_cnpj']
+
+def map_class_exchange(symbols):
+    """Deriva a classe de listagem de cada símbolo, processando cada símbolo distinto uma única vez."""
+    symbols = symbols.astype('category')
+    suffixes = symbols.cat.categories.to_series().str.extract(SYMBOL_SUFFIX_PATTERN, expand=False)
+    classes = suffixes.map(CLASS_EXCHANGE_BY_SUFFIX).fillna(suffixes).to_numpy(dtype=object)
+    # O código -1 (símbolo ausente) aponta para o NaN acrescentado ao final
+    classes = np.append(classes, np.nan)
+    return pd.Series(classes[symbols.cat.codes.to_numpy()], index=symbols.index)
+
+def enrich_wallet_rows(df):
+    """Aplica o enriquecimento (classe de listagem, pesquisa de CNPJ e limpeza de nomes) às linhas informadas."""
+    df = df.copy()
+    
+    # Adiciona a coluna 'country' ao DataFrame original para evitar o erro
+    df['country'] = 'Brazil'
+    
+    df['research_cnpj'] = df['full_name'] + ' - CNPJ'
+    
+    # Limpar as colunas name e full_name
+    df['name'] = df['name'].str.replace(r'\W+', '')
+    df['full_name'] = df['full_name'].str.replace(r'\W+', '')
+    
+    df['class_exchange'] = map_class_exchange(df['symbol'])
+    return df[ENRICHMENT_FINAL_COLUMNS]
+
+def enrichment_version():
+    """Versão do enriquecimento: ENRICHMENT_VERSION mais o hash das tabelas de referência.
+
+    Mudar a versão ou as tabelas invalida as linhas em cache.
+    """
+    definition = json.dumps({
+        'version': ENRICHMENT_VERSION,
+        'class_exchange': CLASS_EXCHANGE_BY_SUFFIX,
+        'suffix_pattern': SYMBOL_SUFFIX_PATTERN.pattern,
+        'columns': [ENRICHMENT_SOURCE_COLUMNS, ENRICHMENT_FINAL_COLUMNS],
+    }, sort_keys=True)
+    return hashlib.sha1(definition.encode('utf-8')).hexdigest()[:12]
+
+def load_enrichment_cache(cache_path, version):
+    """Carrega as linhas já enriquecidas, indexadas pelo hash das colunas de origem."""
+    empty_cache = pd.DataFrame(columns=ENRICHMENT_FINAL_COLUMNS)
+    if not os.path.exists(cache_path):
+        return empty_cache
+    try:
+        cache_df = pd.read_parquet(cache_path)
+    except Exception as e:
+        print(f"Erro ao carregar cache de enriquecimento: {e}")
+        return empty_cache
+    if 'enrichment_version' not in cache_df.columns or (cache_df['enrichment_version'] != version).any():
+        print("Cache de enriquecimento de outra versão descartado.")
+        return empty_cache
+    return cache_df.set_index('source_hash')
+
+def save_enrichment_cache(df, source_hashes, version, cache_path):
+    """Salva as linhas enriquecidas com o hash das colunas de origem (troca atômica do arquivo)."""
+    cache_df = df.assign(source_hash=source_hashes, enrichment_version=version).drop_duplicates(subset='source_hash')
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    cache_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+def merge_stock_info(wallet_df, stock_info_df, cache_path=None):
     """Junta as informações de setor e indústria ao DataFrame original."""
     print("Juntando informações de setor e indústria ao DataFrame...")
     start_time = time.time()
+    cache_path = cache_path or enrichment_cache_path
     merged_df = wallet_df.merge(stock_info_df, left_on='ticker_br', right_on='ticker', how='left')
     merged_df.drop(columns=['ticker'], inplace=True)
+    merged_df.reset_index(drop=True, inplace=True)
     
-    # Adiciona a coluna 'country' ao DataFrame original para evitar o erro
-    merged_df['country'] = 'Brazil'
+    # Reaproveita as linhas cujas colunas de origem não mudaram desde a última execução
+    source_hashes = pd.util.hash_pandas_object(merged_df[ENRICHMENT_SOURCE_COLUMNS], index=False).to_numpy()
+    version = enrichment_version()
+    cache_df = load_enrichment_cache(cache_path, version)
+    cached = np.isin(source_hashes, cache_df.index.to_numpy(dtype=np.uint64))
     
-    merged_df['research_cnpj'] = merged_df['full_name'] + ' - CNPJ'
+    enriched_df = pd.DataFrame(index=merged_df.index, columns=ENRICHMENT_FINAL_COLUMNS, dtype=object)
+    if cached.any():
+        enriched_df.loc[cached] = cache_df.loc[source_hashes[cached], ENRICHMENT_FINAL_COLUMNS].to_numpy()
+    if (~cached).any():
+        enriched_df.loc[~cached] = enrich_wallet_rows(merged_df.loc[~cached]).to_numpy()
+    print(f"Linhas reaproveitadas do cache: {cached.sum()} | Linhas enriquecidas: {(~cached).sum()}")
     
-    # Limpar as colunas name e full_name
-    merged_df['name'] = merged_df['name'].str.replace(r'\W+', '')
-    merged_df['full_name'] = merged_df['full_name'].str.replace(r'\W+', '')
-    
-    merged_df['class_exchange'] = merged_df['symbol'].str.extract(r'(\d+)$').replace({
-        '3': 'Ações Ordinárias',
-        '4': 'Ações Preferenciais',
-        '5': 'Ações Preferenciais Classe A',
-        '6': 'Ações Preferenciais Classe B',
-        '7': 'Ações Preferenciais Classe C',
-        '8': 'Ações Preferenciais Classe D',
-        '11': 'Units (Pacote de valores mobiliários)',
-        '12': 'Ações Preferenciais Classe E',
-        '13': 'Ações Preferenciais Classe F',
-        '31': 'Ações Ordinárias Resgatáveis',
-        '32': 'Ações Preferenciais Resgatáveis',
-        '33': 'Ações Preferenciais Classe A Resgatáveis',
-        '34': 'Ações Preferenciais Classe B Resgatáveis',
-        '35': 'Ações Preferenciais Classe C Resgatáveis',
-        '36': 'Ações Preferenciais Classe D Resgatáveis',
-        '39': 'Ações Preferenciais de Dividendos Prioritários Resgatáveis',
-        '41': 'Ações Ordinárias Não Conversíveis',
-        '42': 'Ações Preferenciais Não Conversíveis',
-        '43': 'Ações Preferenciais Classe A Não Conversíveis',
-        '44': 'Ações Preferenciais Classe B Não Conversíveis',
-        '45': 'Ações Preferenciais Classe C Não Conversíveis',
-        '46': 'Ações Preferenciais Classe D Não Conversíveis',
-        '49': 'Ações Preferenciais de Dividendos Prioritários Não Conversíveis',
-        '50': 'Ações Ordinárias com Direitos Diferenciados',
-        '51': 'Ações Preferenciais com Direitos Diferenciados',
-        '52': 'Ações Preferenciais Classe A com Direitos Diferenciados',
-        '53': 'Ações Preferenciais Classe B com Direitos Diferenciados',
-        '54': 'Ações Preferenciais Classe C com Direitos Diferenciados',
-        '55': 'Ações Preferenciais Classe D com Direitos Diferenciados',
-        '56': 'Ações Preferenciais Diferenciadas de Dividendos Prioritários'
-    })
-    
-    # Reorganizar as colunas
-    final_columns = ['country', 'name', 'full_name', 'symbol', 'ticker_br', 'snome', 'sector', 'industry', 'class_exchange', 'research_cnpj']
-    merged_df = merged_df[final_columns]
+    save_enrichment_cache(enriched_df, source_hashes, version, cache_path)
     
     end_time = time.time()
     print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
-    return merged_df
+    return enriched_df
 
 def get_historical_data_parallel(ticker):
     """Obtém as cotações históricas dos últimos 6 meses."""
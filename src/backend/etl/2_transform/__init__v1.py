@@ -1,4 +1,5 @@
 import os
+import sys
 import pandas as pd
 from google.cloud import bigquery
 from google.oauth2 import service_account
@@ -8,6 +9,10 @@ import time
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credentials/credentials_private_key_gbq/GBQ.json"
 credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
+# Escritor da réplica local compartilhado com a API (src/backend/api/replica_store.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'api'))
+from replica_store import publish_table
+
 def load_from_bigquery(query, credentials_path):
     """Carrega dados do BigQuery usando uma consulta SQL."""
     credentials = service_account.Credentials.from_service_account_file(credentials_path)
@@ -155,18 +160,21 @@ def main():
     if not silver_address_company_br.empty:
         persist_to_bigquery(silver_address_company_br, 'fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_address_company_br', credentials_path)
         save_to_local(silver_address_company_br, "src/backend/data/2_silver/silver_address_company_br.csv")
+        publish_table(silver_address_company_br, "silver_address_company_br")
     else:
         print("Dados de silver_address_company_br estão vazios. Não foram persistidos.")
 
     if not silver_wallet_br.empty:
         persist_to_bigquery(silver_wallet_br, 'fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_wallet_br', credentials_path)
         save_to_local(silver_wallet_br, "src/backend/data/2_silver/silver_wallet_br.csv")
+        publish_table(silver_wallet_br, "silver_wallet_br")
     else:
         print("Dados de silver_wallet_br estão vazios. Não foram persistidos.")
 
     if not silver_historical_stock_price_br.empty:
         persist_to_bigquery(silver_historical_stock_price_br, 'fluent-outpost-424800-h1.2_silver_Neoway_Capital_Market_Analytics.silver_historical_stock_price_br', credentials_path)
         save_to_local(silver_historical_stock_price_br, "src/backend/data/2_silver/silver_historical_stock_price_br.csv")
+        publish_table(silver_historical_stock_price_br, "silver_historical_stock_price_br", sort_columns=['ticker', 'data'])
     else:
         print("Dados de silver_historical_stock_price_br estão vazios. Não foram persistidos.")
 
@@ -1,4 +1,6 @@
 import os
+import sys
+import numpy as np
 import pandas as pd
 from google.cloud import bigquery
 from google.oauth2 import service_account
@@ -8,6 +10,10 @@ import time
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credentials/credentials_private_key_gbq/GBQ.json"
 credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
+# Escritor da réplica local compartilhado com a API (src/backend/api/replica_store.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'api'))
+from replica_store import publish_table
+
 def load_from_bigquery(query, credentials_path):
     """Carrega dados do BigQuery usando uma consulta SQL."""
     credentials = service_account.Credentials.from_service_account_file(credentials_path)
@@ -43,6 +49,24 @@ def transform_to_gold_historical(df):
     df['data'] = pd.to_datetime(df['data'])  # Garante que a coluna data esteja no formato datetime
     return df
 
+def build_latest_snapshot(wallet_df, historical_df, janela=21):
+    """Monta a tabela com o último pregão e métricas recentes de cada ticker (gold_snapshot_stock_br)."""
+    hist = historical_df.sort_values(['ticker', 'data'], kind='mergesort').reset_index(drop=True)
+    grupos = hist.groupby('ticker', sort=False)
+    hist['retorno_1d'] = grupos['fechamento'].pct_change(fill_method=None)
+    hist[f'retorno_{janela}d'] = grupos['fechamento'].pct_change(janela, fill_method=None)
+    hist['retorno_periodo'] = hist['fechamento'] / grupos['fechamento'].transform('first') - 1
+    hist[f'volume_medio_{janela}d'] = grupos['volume'].rolling(janela, min_periods=1).mean().reset_index(level=0, drop=True)
+    hist[f'volatilidade_{janela}d'] = (
+        hist.groupby('ticker', sort=False)['retorno_1d'].rolling(janela, min_periods=2).std().reset_index(level=0, drop=True) * np.sqrt(252)
+    )
+
+    ultimo_pregao = hist.groupby('ticker', sort=False).tail(1)
+    snapshot = wallet_df[['ticker_br', 'snome', 'setor', 'industria', 'classe_listagem']].merge(
+        ultimo_pregao, left_on='ticker_br', right_on='ticker', how='left'
+    ).drop(columns=['ticker'])
+    return snapshot
+
 def main():
     # Queries para carregar dados da camada silver
     query_silver_wallet_br = """
@@ -65,15 +89,23 @@ def main():
     print("Transformando dados para a camada gold...")
     gold_wallet_br = transform_to_gold_wallet(silver_wallet_br)
     gold_historical_stock_price_br = transform_to_gold_historical(silver_historical_stock_price_br)
+    gold_snapshot_stock_br = build_latest_snapshot(gold_wallet_br, gold_historical_stock_price_br)
 
     # Salva dados transformados na camada gold com novos nomes de tabelas
     print("Persistindo dados na camada gold...")
     persist_to_bigquery(gold_wallet_br, 'fluent-outpost-424800-h1.3_gold_Neoway_Capital_Market_Analytics.gold_dim_wallet_br', credentials_path)
     persist_to_bigquery(gold_historical_stock_price_br, 'fluent-outpost-424800-h1.3_gold_Neoway_Capital_Market_Analytics.gold_fact_historical_stock_price_br', credentials_path)
+    persist_to_bigquery(gold_snapshot_stock_br, 'fluent-outpost-424800-h1.3_gold_Neoway_Capital_Market_Analytics.gold_snapshot_stock_br', credentials_path)
 
     # Salvando na camada Gold local
     gold_wallet_br.to_csv("src/backend/data/3_gold/gold_dim_wallet_br.csv", index=False)
     gold_historical_stock_price_br.to_csv("src/backend/data/3_gold/gold_fact_historical_stock_price_br.csv", index=False)
+    gold_snapshot_stock_br.to_csv("src/backend/data/3_gold/gold_snapshot_stock_br.csv", index=False)
+
+    # Publicando na réplica local (o frontend invalida seu cache quando a versão do arquivo muda)
+    publish_table(gold_wallet_br, "gold_dim_wallet_br")
+    publish_table(gold_historical_stock_price_br, "gold_fact_historical_stock_price_br", sort_columns=['ticker', 'data'])
+    publish_table(gold_snapshot_stock_br, "gold_snapshot_stock_br")
 
     print("Processo de transformação para a camada gold concluído!")
 
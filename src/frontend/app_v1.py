@@ -1,23 +1,11 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from plotly import graph_objs as go
 from datetime import datetime, timedelta
-
-# Carregar dados das ações
-def pegar_dados_acoes():
-    path = './src/backend/data/3_gold/gold_dim_wallet_br.csv'  # Caminho para o novo arquivo CSV
-    return pd.read_csv(path)
-
-# Função para baixar dados da ação online
-def pegar_valores_online(symbol, start_date, end_date):
-    try:
-        df = yf.download(symbol, start=start_date, end=end_date)
-        df.reset_index(inplace=True)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao baixar dados da ação: {e}")
-        return pd.DataFrame()  # Retorna um DataFrame vazio em caso de erro
+from data_store import pegar_valores
+from charts import criar_grafico_precos
+from comparison import JANELA_BETA, pegar_comparacao
+from screener import metricas_screener, pegar_screener
 
 # Função para calcular os principais resultados do último dia
 def calcular_principais_resultados(df_valores):
@@ -43,24 +31,75 @@ def criar_card(title, value, color):
     """
     return card_content
 
+def exibir_comparacao(df, start_date, end_date):
+    """Compara várias ações (ou todo o setor/segmento filtrado) no período escolhido."""
+    tickers = st.sidebar.multiselect('Escolha as Ações para Comparar:', list(df['ticker_br']), default=None)
+    if not tickers:
+        # Sem escolha explícita, compara todas as ações dos filtros de setor/segmento
+        tickers = list(df['ticker_br'])
+    janela = st.sidebar.slider('Janela do Beta Móvel (pregões):', 5, 63, JANELA_BETA)
+
+    resultado = pegar_comparacao(tickers, start_date, end_date, janela)
+    if resultado is None or resultado['rebaseado'].empty:
+        st.write("Não há dados disponíveis para as ações selecionadas no período.")
+        return
+    rebaseado, correlacao, beta = resultado['rebaseado'], resultado['correlacao'], resultado['beta']
+
+    st.subheader(f'Desempenho Rebaseado (base 100) - {rebaseado.shape[1]} ações')
+    fig = go.Figure()
+    for ticker in rebaseado.columns:
+        fig.add_trace(go.Scattergl(x=rebaseado.index, y=rebaseado[ticker], mode='lines', name=ticker))
+    fig.update_layout(margin=dict(t=10, b=10), height=400, showlegend=rebaseado.shape[1] <= 20)
+    st.plotly_chart(fig)
+
+    st.subheader('Matriz de Correlação dos Retornos Diários')
+    fig = go.Figure(data=go.Heatmap(z=correlacao.values, x=correlacao.columns, y=correlacao.index,
+                                    zmin=-1, zmax=1, colorscale='RdBu'))
+    fig.update_layout(margin=dict(t=10, b=10), height=500)
+    st.plotly_chart(fig)
+
+    st.subheader(f'Retorno e Beta Móvel ({janela} pregões) vs. Média da Seleção')
+    resumo = pd.DataFrame({
+        'Retorno no Período (%)': rebaseado.ffill().iloc[-1] - 100,
+        'Beta Atual': beta.ffill().iloc[-1]
+    }).sort_values('Retorno no Período (%)', ascending=False)
+    st.write(resumo)
+
+def exibir_screener(screener, setores, segmentos):
+    """Lista as melhores ações pela métrica escolhida a partir do snapshot pré-calculado."""
+    classes = st.sidebar.multiselect('Escolha a Classe de Listagem:', screener.valores('classe_listagem'), default=None)
+    metricas = [coluna for coluna in metricas_screener if coluna in screener.ordens]
+    if not metricas:
+        st.write("Snapshot de métricas indisponível. Execute o pipeline de carga (3_load) para gerar gold_snapshot_stock_br.")
+        return
+    metrica = st.sidebar.selectbox('Ordenar por:', metricas, format_func=metricas_screener.get)
+    crescente = st.sidebar.checkbox('Ordem Crescente', value=False)
+    quantidade = st.sidebar.slider('Quantidade de Ações:', 5, 100, 20)
+
+    posicoes = screener.filtrar(setor=setores, industria=segmentos, classe_listagem=classes)
+    st.subheader(f'Screener - {metricas_screener[metrica]} ({len(posicoes)} ações no filtro)')
+    st.write(screener.top(posicoes, metrica, quantidade, crescente).reset_index(drop=True))
+
 def main():
     st.title('Análise de Ações')
 
     # Sidebar com opções de ações e tipo de gráfico
     st.sidebar.header('Menu de Filtros')
-    df = pegar_dados_acoes()
+    screener = pegar_screener()
     
-    # Filtros adicionais
-    setores = st.sidebar.multiselect('Escolha o Setor:', df['setor'].unique(), default=None)
-    if setores:
-        df = df[df['setor'].isin(setores)]
-    segmentos = st.sidebar.multiselect('Escolha o Segmento:', df['industria'].unique(), default=None)
-    if segmentos:
-        df = df[df['industria'].isin(segmentos)]
+    # Filtros adicionais (resolvidos pelos índices pré-construídos do screener)
+    setores = st.sidebar.multiselect('Escolha o Setor:', screener.valores('setor'), default=None)
+    posicoes = screener.filtrar(setor=setores)
+    segmentos = st.sidebar.multiselect('Escolha o Segmento:', screener.valores('industria', posicoes), default=None)
+    posicoes = screener.filtrar(setor=setores, industria=segmentos)
+    df = screener.linhas(posicoes)
 
-    # Seleção da ação com base nos filtros aplicados
-    acao = df['snome']
-    nome_acao_escolhida = st.sidebar.selectbox('Escolha uma Ação:', ['Tickers'] + list(acao))
+    # Modo de análise: uma ação, comparação entre várias ou screener
+    modo = st.sidebar.radio("Modo de Análise:", ('Ação Individual', 'Comparação', 'Screener'))
+
+    if modo == 'Screener':
+        exibir_screener(screener, setores, segmentos)
+        return
 
     # Definir a data de fim como a data atual
     max_end_date = datetime.today().date()
@@ -70,6 +109,14 @@ def main():
     start_date = st.sidebar.date_input("Data de Início da Análise:", default_start_date, format="DD/MM/YYYY")
     end_date = st.sidebar.date_input("Data de Final da Análise:", max_end_date, max_value=max_end_date, format="DD/MM/YYYY")
 
+    if modo == 'Comparação':
+        exibir_comparacao(df, start_date, end_date)
+        return
+
+    # Seleção da ação com base nos filtros aplicados
+    acao = df['snome']
+    nome_acao_escolhida = st.sidebar.selectbox('Escolha uma Ação:', ['Tickers'] + list(acao))
+
     # Aplicar filtros ao DataFrame
     if nome_acao_escolhida != 'Tickers':
         df_acao = df[df['snome'] == nome_acao_escolhida]
@@ -77,8 +124,8 @@ def main():
         if not df_acao.empty:
             acao_escolhida = df_acao.iloc[0]['ticker_br']
             
-            # Baixar dados da ação
-            df_valores = pegar_valores_online(acao_escolhida, start_date, end_date)
+            # Recortar o histórico da ação (em cache) para o período escolhido
+            df_valores = pegar_valores(acao_escolhida, start_date, end_date)
 
             if not df_valores.empty:
                 # Calcular e exibir principais resultados do último dia em cards personalizados
@@ -105,18 +152,7 @@ def main():
                 # Criar o gráfico
                 st.subheader(f'Gráfico de Preços da Ação {acao_escolhida}')
                 tipo_grafico = st.sidebar.radio("Selecione o Tipo de Gráfico:", ('Candlestick', 'Linha'))
-                if tipo_grafico == 'Candlestick':
-                    fig = go.Figure(data=[go.Candlestick(x=df_valores['Date'],
-                                                         open=df_valores['Open'],
-                                                         high=df_valores['High'],
-                                                         low=df_valores['Low'],
-                                                         close=df_valores['Close'])])
-                else:
-                    fig = go.Figure()
-                    fig.add_trace(go.Scatter(x=df_valores['Date'], 
-                                             y=df_valores['Close'], 
-                                             name='Preço de Fechamento',
-                                             line_color='blue'))
+                fig = criar_grafico_precos(df_valores, tipo_grafico)
                 
                 # Ajustar o layout do gráfico
                 fig.update_layout(
@@ -130,7 +166,7 @@ def main():
                 st.subheader(f'Tabela de Valores - {acao_escolhida}')
                 if not df_valores.empty:
                     df_valores_traduzido = df_valores.rename(columns={"Date": "Data", "Open": "Abertura", "High": "Alta", "Low": "Baixa", "Close": "Fechamento", "Volume": "Volume"})
-                    st.write(df_valores_traduzido.drop(columns=['Adj Close']).tail(10))
+                    st.write(df_valores_traduzido.drop(columns=['Adj Close'], errors='ignore').tail(10))
                 else:
                     st.write("Não há dados disponíveis para exibir.")
             else:
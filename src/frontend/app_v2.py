@@ -2,7 +2,7 @@ import os
 import datetime
 import pandas as pd
 import streamlit as st
-from plotly import graph_objs as go
+from charts import criar_grafico_precos
 from google.cloud import bigquery
 from google.oauth2 import service_account
 
@@ -15,31 +15,49 @@ def get_absolute_path(relative_path):
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credentials/credentials_private_key_gbq/GBQ.json"
 credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
+# Tempo máximo (segundos) que os dados consultados ficam em cache
+CACHE_TTL = 60 * 60
+
+# Cliente BigQuery compartilhado entre reruns e sessões
+@st.cache_resource
 def get_bigquery_client():
     return bigquery.Client()
 
-def query_bigquery(client, query):
-    query_job = client.query(query)
+def query_bigquery(client, query, parametros=None):
+    job_config = bigquery.QueryJobConfig(query_parameters=parametros or [])
+    query_job = client.query(query, job_config=job_config)
     results = query_job.result().to_dataframe()
     return results
 
 # Função para pegar dados das ações do BigQuery
-def pegar_dados_acoes(client):
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def pegar_dados_acoes(_client):
     query = """
     SELECT DISTINCT snome FROM `fluent-outpost-424800-h1.gold_dim_wallet_br`
     """
-    return query_bigquery(client, query)
+    return query_bigquery(_client, query)
 
-# Função para pegar valores históricos das ações do BigQuery
-def pegar_valores_historicos(client, sigla_acao, start_date, end_date):
-    query = f"""
+# Função para pré-carregar todo o histórico de uma ação (uma consulta por ticker)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def pegar_historico_completo(_client, sigla_acao):
+    query = """
     SELECT Data, Abertura, Máximo, Mínimo, Fechamento
     FROM `fluent-outpost-424800-h1.gold_fact_historical_stock_price_br`
-    WHERE ticker = '{sigla_acao}'
-    AND Data BETWEEN '{start_date}' AND '{end_date}'
+    WHERE ticker = @ticker
     ORDER BY Data
     """
-    return query_bigquery(client, query)
+    parametros = [bigquery.ScalarQueryParameter("ticker", "STRING", sigla_acao)]
+    df = query_bigquery(_client, query, parametros)
+    df['Data'] = pd.to_datetime(df['Data']).dt.tz_localize(None)
+    return df
+
+# Função para pegar valores históricos das ações (recorte local do histórico em cache)
+def pegar_valores_historicos(client, sigla_acao, start_date, end_date):
+    df = pegar_historico_completo(client, sigla_acao)
+    inicio = df['Data'].searchsorted(pd.Timestamp(start_date), side='left')
+    # Data é gravada às 03:00 (meia-noite de Brasília em UTC): o fim inclui o último dia inteiro, como em filtrar_periodo
+    fim = df['Data'].searchsorted(pd.Timestamp(end_date) + pd.Timedelta(days=1), side='left')
+    return df.iloc[inicio:fim].reset_index(drop=True)
 
 # Função para calcular os principais resultados do último dia
 def calcular_principais_resultados(df_valores):
@@ -98,6 +116,9 @@ end_date = st.sidebar.date_input("Data de fim:", datetime.date.today())
 # Seleção da ação
 if nome_acao_escolhida != 'Escolher Todos':
     df_valores = pegar_valores_historicos(client, nome_acao_escolhida, start_date, end_date)
+    if df_valores.empty:
+        st.error("Não há dados para a ação selecionada no período escolhido.")
+        st.stop()
 
     # Calcular e exibir principais resultados do último dia em cards personalizados
     st.subheader('Principais resultados do último dia')
@@ -112,18 +133,8 @@ if nome_acao_escolhida != 'Escolher Todos':
 
     # Criar o gráfico
     st.subheader(f'Gráfico de preços da ação {nome_acao_escolhida}')
-    if tipo_grafico == 'Candlestick':
-        fig = go.Figure(data=[go.Candlestick(x=df_valores['Data'],
-                                             open=df_valores['Abertura'],
-                                             high=df_valores['Máximo'],
-                                             low=df_valores['Mínimo'],
-                                             close=df_valores['Fechamento'])])
-    else:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df_valores['Data'],
-                                 y=df_valores['Fechamento'],
-                                 name='Preço de Fechamento',
-                                 line_color='blue'))
+    fig = criar_grafico_precos(df_valores, tipo_grafico, data='Data', abertura='Abertura',
+                               maxima='Máximo', minima='Mínimo', fechamento='Fechamento')
     st.plotly_chart(fig)
 
     # Tabela de valores
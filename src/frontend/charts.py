@@ -0,0 +1,64 @@
+import pandas as pd
+from plotly import graph_objs as go
+
+# Quantidade máxima de barras/pontos enviados ao navegador por gráfico
+MAX_BARRAS = 300
+
+# Tamanhos de barra disponíveis: (regra do pandas, duração aproximada em dias, descrição)
+intervalos_barras = [
+    ('D', 1, 'Diário'),
+    ('W', 7, 'Semanal'),
+    ('ME', 30.44, 'Mensal'),
+    ('QE', 91.31, 'Trimestral'),
+    ('YE', 365.25, 'Anual'),
+]
+
+
+def escolher_intervalo(df, data, max_barras=MAX_BARRAS):
+    """Escolhe o menor tamanho de barra que mantém o gráfico com no máximo max_barras barras."""
+    if len(df) <= max_barras:
+        return intervalos_barras[0]
+    dias = (df[data].iloc[-1] - df[data].iloc[0]).days + 1
+    for intervalo in intervalos_barras[1:]:
+        if dias / intervalo[1] <= max_barras:
+            return intervalo
+    return intervalos_barras[-1]
+
+def agregar_ohlc(df, regra, data, abertura, maxima, minima, fechamento):
+    """Agrega o histórico diário em barras OHLC do tamanho indicado pela regra."""
+    agregado = df.groupby(pd.Grouper(key=data, freq=regra)).agg(**{
+        data: (data, 'first'),
+        abertura: (abertura, 'first'),
+        maxima: (maxima, 'max'),
+        minima: (minima, 'min'),
+        fechamento: (fechamento, 'last'),
+    })
+    return agregado.dropna(subset=[fechamento]).reset_index(drop=True)
+
+def criar_grafico_precos(df, tipo_grafico, data='Date', abertura='Open', maxima='High', minima='Low',
+                         fechamento='Close', max_barras=MAX_BARRAS):
+    """Cria o gráfico de preços com o tamanho de barra ajustado ao período visível."""
+    df = df.assign(**{data: pd.to_datetime(df[data])})
+    regra, _, descricao = escolher_intervalo(df, data, max_barras)
+    if regra != 'D':
+        df = agregar_ohlc(df, regra, data, abertura, maxima, minima, fechamento)
+
+    if tipo_grafico == 'Candlestick':
+        fig = go.Figure(data=[go.Candlestick(x=df[data],
+                                             open=df[abertura],
+                                             high=df[maxima],
+                                             low=df[minima],
+                                             close=df[fechamento],
+                                             name=descricao)])
+        # O range slider duplicaria todas as barras no payload
+        fig.update_layout(xaxis_rangeslider_visible=False)
+    else:
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(x=df[data],
+                                   y=df[fechamento],
+                                   mode='lines',
+                                   name='Preço de Fechamento',
+                                   line_color='blue'))
+
+    fig.update_layout(xaxis_title=f'Barras: {descricao}')
+    return fig
@@ -0,0 +1,60 @@
+import pandas as pd
+import streamlit as st
+from data_store import CACHE_TTL, pegar_matriz_fechamento, versao_tabela
+
+# Janela padrão (em pregões) do beta móvel
+JANELA_BETA = 21
+
+
+def rebasear(precos):
+    """Rebaseia cada coluna para 100 no primeiro preço válido do período."""
+    return precos.div(precos.bfill().iloc[0]) * 100
+
+def beta_movel(retornos, mercado, janela=JANELA_BETA):
+    """Beta móvel de cada ticker contra o mercado, calculado de uma vez para toda a matriz.
+
+    Dias sem negociação ficam como NaN e são ignorados na janela, tanto no ticker quanto no mercado.
+    """
+    mercado = retornos.notna().mul(mercado, axis=0).where(retornos.notna())
+    minimo = max(janela // 2, 2)
+
+    def media_movel(df):
+        return df.rolling(janela, min_periods=minimo).mean()
+
+    covariancia = media_movel(retornos * mercado) - media_movel(retornos) * media_movel(mercado)
+    variancia = media_movel(mercado ** 2) - media_movel(mercado) ** 2
+    return covariancia / variancia
+
+def calcular_comparacao(precos, janela=JANELA_BETA):
+    """Calcula desempenho rebaseado, matriz de correlação e beta móvel sobre a matriz data x ticker.
+
+    O mercado de referência é a média igualmente ponderada dos retornos dos tickers selecionados.
+    Os retornos vêm da matriz sem preenchimento: dias sem negócio não viram retorno zero.
+    """
+    precos = precos.dropna(axis=1, how='all')
+    retornos = precos.pct_change(fill_method=None)
+    mercado = retornos.mean(axis=1)
+    return {
+        # Preenche só lacunas internas: ações deslistadas não são estendidas como linha reta
+        'rebaseado': rebasear(precos.ffill(limit_area='inside')),
+        'correlacao': retornos.corr(min_periods=max(janela // 2, 2)),
+        'beta': beta_movel(retornos, mercado, janela),
+    }
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=32)
+def comparar_tickers(tickers, start_date, end_date, janela, versao):
+    """Resultado da comparação em cache por seleção (tickers, período, janela e versão do pipeline)."""
+    precos = pegar_matriz_fechamento(tickers)
+    if precos.empty:
+        return None
+    # Mesmo recorte de filtrar_periodo: as datas ficam às 03:00, então o fim inclui o último dia inteiro
+    inicio = precos.index.searchsorted(pd.Timestamp(start_date), side='left')
+    fim = precos.index.searchsorted(pd.Timestamp(end_date) + pd.Timedelta(days=1), side='left')
+    precos = precos.iloc[inicio:fim]
+    if precos.empty:
+        return None
+    return calcular_comparacao(precos, janela)
+
+def pegar_comparacao(tickers, start_date, end_date, janela=JANELA_BETA):
+    versao = versao_tabela('gold_fact_historical_stock_price_br')
+    return comparar_tickers(tuple(sorted(tickers)), start_date, end_date, janela, versao)
@@ -0,0 +1,119 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+import yfinance as yf
+
+# Réplica Arrow publicada pelo pipeline (mesmo diretório usado pelo ETL e pela API)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'api'))
+from replica_store import replica_directory
+
+# Caminho da camada gold local
+gold_directory = './src/backend/data/3_gold'
+
+# Tempo máximo (segundos) que os dados ficam em cache entre execuções do pipeline
+CACHE_TTL = 60 * 60
+
+# Colunas da tabela gold traduzidas para o padrão usado nos gráficos do app
+colunas_historico = {
+    'data': 'Date',
+    'abertura': 'Open',
+    'maxima': 'High',
+    'minima': 'Low',
+    'fechamento': 'Close',
+    'volume': 'Volume'
+}
+
+
+def caminho_tabela(nome_tabela):
+    """Retorna o arquivo mais rápido disponível para a tabela (réplica Arrow ou CSV gold)."""
+    arrow_path = os.path.join(replica_directory, f'{nome_tabela}.arrow')
+    if os.path.exists(arrow_path):
+        return arrow_path
+    return os.path.join(gold_directory, f'{nome_tabela}.csv')
+
+def versao_tabela(nome_tabela):
+    """Versão da tabela (mtime do arquivo); muda a cada execução do pipeline e invalida o cache."""
+    try:
+        return os.stat(caminho_tabela(nome_tabela)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def ler_tabela(caminho):
+    if caminho.endswith('.arrow'):
+        return pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all().to_pandas()
+    return pd.read_csv(caminho)
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _carregar_tabela_historico(caminho, versao):
+    """Carrega o histórico gold uma única vez, ordenado por ticker e data."""
+    df = ler_tabela(caminho).rename(columns=colunas_historico)
+    df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize(None)
+    return df.sort_values(['ticker', 'Date'], kind='mergesort').reset_index(drop=True)
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _carregar_indice_historico(caminho, versao):
+    """Índice ticker -> (início, fim) das linhas de cada ticker na tabela ordenada."""
+    tickers = _carregar_tabela_historico(caminho, versao)['ticker'].to_numpy()
+    if len(tickers) == 0:
+        return {}
+    mudancas = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    inicios = np.concatenate(([0], mudancas))
+    fins = np.concatenate((mudancas, [len(tickers)]))
+    return {tickers[inicio]: (int(inicio), int(fim)) for inicio, fim in zip(inicios, fins)}
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _baixar_historico_online(symbol):
+    """Fallback para tickers fora da camada gold: baixa o histórico completo uma única vez.
+
+    O yfinance devolve um DataFrame vazio quando falha; nesse caso levanta exceção para o erro não ficar em cache.
+    """
+    df = yf.download(symbol, period='max')
+    if df.empty:
+        raise ValueError(f"Nenhum dado retornado para {symbol}")
+    return df.reset_index()
+
+def pegar_historico_ticker(symbol):
+    """Retorna todo o histórico de um ticker, vindo da camada gold local sempre que possível."""
+    nome_tabela = 'gold_fact_historical_stock_price_br'
+    versao = versao_tabela(nome_tabela)
+    if versao is not None:
+        caminho = caminho_tabela(nome_tabela)
+        indice = _carregar_indice_historico(caminho, versao)
+        if symbol in indice:
+            inicio, fim = indice[symbol]
+            return _carregar_tabela_historico(caminho, versao).iloc[inicio:fim].drop(columns=['ticker']).reset_index(drop=True)
+    try:
+        return _baixar_historico_online(symbol)
+    except Exception as e:
+        st.error(f"Erro ao baixar dados da ação: {e}")
+        return pd.DataFrame()
+
+def pegar_matriz_fechamento(tickers):
+    """Matriz data x ticker com os fechamentos dos tickers pedidos, montada a partir das fatias da tabela."""
+    nome_tabela = 'gold_fact_historical_stock_price_br'
+    versao = versao_tabela(nome_tabela)
+    if versao is None:
+        return pd.DataFrame()
+    caminho = caminho_tabela(nome_tabela)
+    indice = _carregar_indice_historico(caminho, versao)
+    fatias = [np.arange(*indice[ticker]) for ticker in tickers if ticker in indice]
+    if not fatias:
+        return pd.DataFrame()
+    linhas = _carregar_tabela_historico(caminho, versao).iloc[np.concatenate(fatias)]
+    return linhas.pivot_table(index='Date', columns='ticker', values='Close', aggfunc='last').sort_index()
+
+def filtrar_periodo(df, start_date, end_date):
+    """Recorta o histórico já carregado para o período [start_date, end_date] sem nova consulta."""
+    if df.empty:
+        return df
+    datas = pd.to_datetime(df['Date']).values
+    inicio = datas.searchsorted(pd.Timestamp(start_date).to_datetime64(), side='left')
+    fim = datas.searchsorted((pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_datetime64(), side='left')
+    return df.iloc[inicio:fim].reset_index(drop=True)
+
+def pegar_valores(symbol, start_date, end_date):
+    """Histórico do ticker no período escolhido, fatiado a partir dos dados em cache."""
+    return filtrar_periodo(pegar_historico_ticker(symbol), start_date, end_date)
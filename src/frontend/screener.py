@@ -0,0 +1,77 @@
+import numpy as np
+import streamlit as st
+from data_store import CACHE_TTL, caminho_tabela, ler_tabela, versao_tabela
+
+# Colunas com índice pré-construído para filtros compostos
+campos_indexados = ('setor', 'industria', 'classe_listagem')
+
+# Métricas do snapshot disponíveis para ordenação (coluna -> rótulo)
+metricas_screener = {
+    'retorno_periodo': 'Retorno no Período',
+    'retorno_21d': 'Retorno 21 dias',
+    'retorno_1d': 'Retorno 1 dia',
+    'volatilidade_21d': 'Volatilidade 21 dias (anual.)',
+    'volume_medio_21d': 'Volume Médio 21 dias',
+    'fechamento': 'Fechamento',
+    'volume': 'Volume',
+}
+
+
+class Screener:
+    """Tabela de último snapshot por ticker com índices por setor, indústria e classe de listagem."""
+
+    def __init__(self, tabela):
+        self.tabela = tabela.reset_index(drop=True)
+        self.indices = {
+            campo: {valor: np.asarray(posicoes) for valor, posicoes in self.tabela.groupby(campo, sort=True).indices.items()}
+            for campo in campos_indexados if campo in self.tabela.columns
+        }
+        # Ordem decrescente de cada métrica, calculada uma única vez (valores ausentes ao final)
+        self.ordens = {
+            coluna: np.argsort(-self.tabela[coluna].to_numpy(dtype=float, na_value=np.nan), kind='stable')
+            for coluna in metricas_screener if coluna in self.tabela.columns
+        }
+
+    def valores(self, campo, posicoes=None):
+        """Valores distintos de um campo indexado, opcionalmente restritos às linhas informadas."""
+        if posicoes is None:
+            return list(self.indices.get(campo, {}))
+        presentes = set(self.tabela[campo].to_numpy()[posicoes])
+        return [valor for valor in self.indices.get(campo, {}) if valor in presentes]
+
+    def filtrar(self, **filtros):
+        """Posições das linhas que atendem a todos os filtros (valores de um mesmo campo são combinados com OU)."""
+        posicoes = None
+        for campo, valores in filtros.items():
+            if not valores:
+                continue
+            indice = self.indices[campo]
+            encontrados = [indice[valor] for valor in valores if valor in indice]
+            candidatas = np.unique(np.concatenate(encontrados)) if encontrados else np.array([], dtype=int)
+            posicoes = candidatas if posicoes is None else np.intersect1d(posicoes, candidatas, assume_unique=True)
+        return np.arange(len(self.tabela)) if posicoes is None else posicoes
+
+    def linhas(self, posicoes):
+        return self.tabela.iloc[posicoes]
+
+    def top(self, posicoes, metrica, n=20, crescente=False):
+        """As n melhores linhas pela métrica dentro das posições filtradas, usando a ordem pré-calculada."""
+        ordem = self.ordens[metrica]
+        if crescente:
+            ordem = ordem[::-1]
+        selecionadas = np.zeros(len(self.tabela), dtype=bool)
+        selecionadas[posicoes] = True
+        ordem = ordem[selecionadas[ordem]]
+        valores = self.tabela[metrica].to_numpy(dtype=float, na_value=np.nan)[ordem]
+        return self.tabela.iloc[ordem[~np.isnan(valores)][:n]]
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _carregar_screener(caminho, versao):
+    return Screener(ler_tabela(caminho))
+
+def pegar_screener():
+    """Screener sobre gold_snapshot_stock_br; sem snapshot, indexa apenas a dimensão de ações."""
+    nome_tabela = 'gold_snapshot_stock_br'
+    if versao_tabela(nome_tabela) is None:
+        nome_tabela = 'gold_dim_wallet_br'
+    return _carregar_screener(caminho_tabela(nome_tabela), versao_tabela(nome_tabela))
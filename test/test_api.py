@@ -1 +1,164 @@
-# DEV TEST
\ No newline at end of file
+# DEV TEST
+import os
+import sys
+import asyncio
+from datetime import date
+import pandas as pd
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend', 'api'))
+
+from fastapi.testclient import TestClient
+import api_stocks_br
+import openai_stub_server
+from openai_api import ChatGPTClient
+from openai_stub_server import StubHandler, iniciar_servidor
+from intraday_stream import BarBuilder, IntradayStream, ReplaySource, Tick
+from replica_store import ReplicaStore, publish_table
+
+# Meia-noite de 02/01/2024 em Brasília (03:00 UTC), alinhada às barras diárias da B3
+DIA = 1704164400
+
+
+def test_bar_builder_agrupa_ticks_por_intervalo():
+    builder = BarBuilder()
+    builder.atualizar(Tick('PETR4.SA', DIA + 61, 10.0, 100))
+    builder.atualizar(Tick('PETR4.SA', DIA + 90, 12.0, 200))
+    builder.atualizar(Tick('PETR4.SA', DIA + 110, 9.0, 300))
+
+    assert builder.abertas[('PETR4.SA', '1m')] == [DIA + 60, 10.0, 12.0, 9.0, 9.0, 600]
+    assert builder.abertas[('PETR4.SA', '5m')] == [DIA, 10.0, 12.0, 9.0, 9.0, 600]
+    assert builder.abertas[('PETR4.SA', '1d')] == [DIA, 10.0, 12.0, 9.0, 9.0, 600]
+
+def test_bar_builder_fecha_barra_com_tick_do_proximo_periodo():
+    builder = BarBuilder()
+    builder.atualizar(Tick('PETR4.SA', DIA + 10, 10.0, 100))
+    atualizadas, fechadas = builder.atualizar(Tick('PETR4.SA', DIA + 70, 11.0, 100))
+
+    assert fechadas == [(('PETR4.SA', '1m'), [DIA, 10.0, 10.0, 10.0, 10.0, 100])]
+    assert len(atualizadas) == 3
+    assert builder.abertas[('PETR4.SA', '1m')][0] == DIA + 60
+
+def test_bar_builder_descarta_tick_atrasado_em_todos_os_intervalos():
+    builder = BarBuilder()
+    builder.atualizar(Tick('PETR4.SA', DIA + 7200, 12.0, 100))
+    atualizadas, fechadas = builder.atualizar(Tick('PETR4.SA', DIA + 10, 13.0, 500))
+
+    assert (atualizadas, fechadas) == ([], [])
+    assert builder.ticks_atrasados == 1
+    assert builder.abertas[('PETR4.SA', '1d')] == [DIA, 12.0, 12.0, 12.0, 12.0, 100]
+
+def test_bar_builder_fecha_barras_vencidas_pelo_relogio():
+    builder = BarBuilder()
+    builder.atualizar(Tick('PETR4.SA', DIA + 10, 10.0, 100))
+
+    assert builder.fechar_vencidas(DIA + 59) == []
+    fechadas = builder.fechar_vencidas(DIA + 60)
+    assert [chave for chave, _ in fechadas] == [('PETR4.SA', '1m')]
+    assert set(builder.abertas) == {('PETR4.SA', '5m'), ('PETR4.SA', '1d')}
+
+    # Um tick do minuto já fechado não reabre a barra
+    builder.atualizar(Tick('PETR4.SA', DIA + 30, 11.0, 100))
+    assert builder.ticks_atrasados == 1
+    assert ('PETR4.SA', '1m') not in builder.abertas
+
+def test_intraday_stream_grava_apenas_barras_fechadas(tmp_path):
+    ticks = pd.DataFrame({
+        'ticker': ['PETR4.SA', 'PETR4.SA', 'VALE3.SA'],
+        'timestamp': [DIA + 10, DIA + 70, DIA + 75],
+        'price': [10.0, 11.0, 60.0],
+        'volume': [100, 200, 300],
+    })
+    ticks.to_csv(tmp_path / 'ticks.csv', index=False)
+    caminho_raw = tmp_path / 'raw_intraday.csv'
+
+    stream = IntradayStream(ReplaySource(tmp_path / 'ticks.csv', velocidade=0), caminho_raw=str(caminho_raw))
+    asyncio.run(stream.run())
+
+    gravadas = pd.read_csv(caminho_raw)
+    assert gravadas[['ticker', 'interval', 'Close']].values.tolist() == [['PETR4.SA', '1m', 10.0]]
+
+
+def publicar_historico(diretorio):
+    """Publica um histórico fora de ordem; publish_table ordena por ticker e data."""
+    historico = pd.DataFrame({
+        'ticker': ['VALE3.SA', 'PETR4.SA', 'VALE3.SA', 'PETR4.SA', 'ABEV3.SA', 'PETR4.SA'],
+        'data': pd.to_datetime(['2024-01-03', '2024-01-04', '2024-01-02', '2024-01-02', '2024-01-02', '2024-01-03']) + pd.Timedelta(hours=3),
+        'fechamento': [61.0, 38.0, 60.0, 36.0, 14.0, 37.0],
+    })
+    publish_table(historico, 'silver_historical_stock_price_br', sort_columns=['ticker', 'data'], directory=str(diretorio))
+    return ReplicaStore(str(diretorio))
+
+def test_replica_indexa_faixas_contiguas_por_ticker(tmp_path):
+    tabela = publicar_historico(tmp_path).get('silver_historical_stock_price_br', index_column='ticker', sort_column='data')
+
+    assert tabela.index == {'ABEV3.SA': (0, 1), 'PETR4.SA': (1, 4), 'VALE3.SA': (4, 6)}
+    assert [linha['fechamento'] for linha in tabela.lookup('PETR4.SA')] == [36.0, 37.0, 38.0]
+    assert tabela.lookup('ITUB4.SA') == []
+    assert not list(tmp_path.glob('*.tmp'))
+
+def test_replica_lookup_inclui_o_ultimo_dia_do_periodo(tmp_path):
+    tabela = publicar_historico(tmp_path).get('silver_historical_stock_price_br', index_column='ticker', sort_column='data')
+
+    # As datas ficam às 03:00; o fim do período inclui o dia inteiro
+    linhas = tabela.lookup('PETR4.SA', start=date(2024, 1, 3), end=date(2024, 1, 4))
+    assert [linha['fechamento'] for linha in linhas] == [37.0, 38.0]
+    assert tabela.lookup('PETR4.SA', start=date(2024, 1, 5)) == []
+
+def test_historico_completo_sem_limit_e_paginado_com_headers(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_stocks_br, 'replica', publicar_historico(tmp_path))
+    monkeypatch.setattr(api_stocks_br, 'HISTORICAL_BATCH_SIZE', 4)
+    client = TestClient(api_stocks_br.app)
+
+    completo = client.get('/silver_historical_stock_price_br')
+    assert completo.status_code == 200
+    assert completo.headers['X-Total-Count'] == '6'
+    assert [linha['fechamento'] for linha in completo.json()] == [14.0, 36.0, 37.0, 38.0, 60.0, 61.0]
+
+    pagina = client.get('/silver_historical_stock_price_br', params={'offset': 2, 'limit': 3})
+    assert [linha['fechamento'] for linha in pagina.json()] == [37.0, 38.0, 60.0]
+    assert (pagina.headers['X-Total-Count'], pagina.headers['X-Next-Offset']) == ('6', '5')
+
+    ultima = client.get('/silver_historical_stock_price_br', params={'offset': 5, 'limit': 3})
+    assert len(ultima.json()) == 1 and 'X-Next-Offset' not in ultima.headers
+
+
+@pytest.fixture
+def stub_openai(monkeypatch):
+    """Servidor stub do OpenAI em uma porta livre, com os contadores zerados."""
+    monkeypatch.setattr(openai_stub_server, 'LATENCIA', 0.05)
+    for contador in ('total_requisicoes', 'em_andamento', 'pico_concorrencia'):
+        monkeypatch.setattr(StubHandler, contador, 0)
+    servidor = iniciar_servidor(port=0)
+    yield f"http://127.0.0.1:{servidor.server_address[1]}/v1"
+    servidor.shutdown()
+    servidor.server_close()
+
+def test_chatgpt_lote_deduplica_e_reutiliza_cache(stub_openai):
+    cliente = ChatGPTClient(api_key='stub', base_url=stub_openai)
+    perguntas = ['Resuma PETR4.SA', 'Resuma  PETR4.SA\n', 'Resuma VALE3.SA']
+
+    respostas = cliente.perguntar_lote(perguntas)
+    # Perguntas equivalentes vão uma única vez, com o texto original da primeira ocorrência
+    assert respostas == ['Resposta stub para: Resuma PETR4.SA'] * 2 + ['Resposta stub para: Resuma VALE3.SA']
+    assert StubHandler.total_requisicoes == 2
+
+    assert cliente.perguntar('  Resuma VALE3.SA') == 'Resposta stub para: Resuma VALE3.SA'
+    assert cliente.perguntar_lote(perguntas) == respostas
+    assert StubHandler.total_requisicoes == 2
+
+def test_chatgpt_lote_respeita_limite_de_concorrencia(stub_openai):
+    cliente = ChatGPTClient(api_key='stub', base_url=stub_openai)
+    cliente.perguntar_lote([f'Resuma TCKR{i}.SA' for i in range(12)], max_concorrencia=3)
+
+    assert StubHandler.total_requisicoes == 12
+    assert StubHandler.pico_concorrencia == 3
+
+def test_chatgpt_nao_reenvia_apos_timeout_de_leitura(stub_openai, monkeypatch):
+    monkeypatch.setattr(openai_stub_server, 'LATENCIA', 0.5)
+    cliente = ChatGPTClient(api_key='stub', base_url=stub_openai, timeout=(1, 0.1))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        cliente.perguntar('Resuma PETR4.SA')
+    assert StubHandler.total_requisicoes == 1
@@ -1 +1,146 @@
-# DEV TEST
\ No newline at end of file
+# DEV TEST
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'frontend'))
+
+import comparison
+from charts import MAX_BARRAS, agregar_ohlc, criar_grafico_precos, escolher_intervalo
+from comparison import beta_movel, calcular_comparacao
+from screener import Screener
+
+
+def historico_diario(inicio='2014-01-15', fim='2024-01-14', seed=0):
+    """Pregões diários com preços em passeio aleatório e colunas no padrão do app (Date, Open, ...)."""
+    datas = pd.bdate_range(inicio, fim) + pd.Timedelta(hours=3)
+    rng = np.random.default_rng(seed)
+    fechamento = 20 * np.exp(np.cumsum(rng.normal(0, 0.01, len(datas))))
+    return pd.DataFrame({
+        'Date': datas,
+        'Open': fechamento * (1 + rng.normal(0, 0.002, len(datas))),
+        'High': fechamento * 1.01,
+        'Low': fechamento * 0.99,
+        'Close': fechamento,
+    })
+
+
+def test_escolher_intervalo_pelo_tamanho_do_periodo():
+    df = historico_diario()
+
+    assert escolher_intervalo(df.tail(MAX_BARRAS), 'Date')[0] == 'D'
+    assert escolher_intervalo(df.tail(400), 'Date')[0] == 'W'
+    assert escolher_intervalo(df, 'Date')[0] == 'ME'
+
+def test_agregar_ohlc_mensal_em_dez_anos():
+    df = historico_diario()
+    mensal = agregar_ohlc(df, 'ME', 'Date', 'Open', 'High', 'Low', 'Close')
+
+    assert len(mensal) == 121
+    mes = df[df['Date'].dt.to_period('M') == '2019-06']
+    barra = mensal[mensal['Date'].dt.to_period('M') == '2019-06'].iloc[0]
+    assert barra['Date'] == mes['Date'].iloc[0]
+    assert barra['Open'] == mes['Open'].iloc[0]
+    assert barra['High'] == mes['High'].max()
+    assert barra['Low'] == mes['Low'].min()
+    assert barra['Close'] == mes['Close'].iloc[-1]
+
+def test_criar_grafico_precos_limita_barras_enviadas():
+    df = historico_diario()
+
+    linha = criar_grafico_precos(df, 'Linha')
+    assert linha.data[0].type == 'scattergl'
+    assert len(linha.data[0].y) == 121
+
+    candle = criar_grafico_precos(df.tail(100), 'Candlestick')
+    assert candle.data[0].type == 'candlestick'
+    assert len(candle.data[0].close) == 100
+    assert candle.layout.xaxis.rangeslider.visible is False
+
+
+def matriz_fechamento(tickers=8, dias=300, lacunas=0.3, seed=1):
+    """Matriz data x ticker de fechamentos com uma fração de dias sem negociação (NaN)."""
+    rng = np.random.default_rng(seed)
+    datas = pd.bdate_range('2023-01-02', periods=dias) + pd.Timedelta(hours=3)
+    precos = pd.DataFrame(30 * np.exp(np.cumsum(rng.normal(0, 0.02, (dias, tickers)), axis=0)),
+                          index=datas, columns=[f'TCKR{i}.SA' for i in range(tickers)])
+    return precos.mask(rng.random((dias, tickers)) < lacunas)
+
+
+def test_beta_movel_igual_ao_rolling_do_pandas_com_lacunas():
+    retornos = matriz_fechamento().pct_change(fill_method=None)
+    mercado = retornos.mean(axis=1)
+    beta = beta_movel(retornos, mercado, janela=21)
+
+    for ticker in retornos.columns:
+        # Referência: cov/var do pandas sobre os dias em que o ticker negociou
+        mercado_ticker = mercado.where(retornos[ticker].notna())
+        referencia = (retornos[ticker].rolling(21, min_periods=10).cov(mercado_ticker)
+                      / mercado_ticker.rolling(21, min_periods=10).var())
+        pd.testing.assert_series_equal(beta[ticker], referencia, check_names=False, atol=1e-10)
+
+def test_calcular_comparacao_nao_preenche_retornos_nem_estende_deslistadas():
+    precos = matriz_fechamento(tickers=3, dias=60, lacunas=0)
+    precos.iloc[10, 0] = np.nan  # dia sem negócio
+    precos.iloc[40:, 1] = np.nan  # ação deslistada
+    resultado = calcular_comparacao(precos)
+
+    rebaseado = resultado['rebaseado']
+    assert (rebaseado.iloc[0] == 100).all()
+    assert rebaseado.iloc[10, 0] == rebaseado.iloc[9, 0]
+    assert rebaseado.iloc[40:, 1].isna().all()
+
+    retornos = precos.pct_change(fill_method=None)
+    assert np.isnan(retornos.iloc[10, 0]) and np.isnan(retornos.iloc[11, 0])
+    pd.testing.assert_frame_equal(resultado['correlacao'], retornos.corr(min_periods=10))
+
+def test_comparar_tickers_inclui_o_ultimo_dia_do_periodo(monkeypatch):
+    precos = matriz_fechamento(tickers=3, dias=30, lacunas=0)
+    monkeypatch.setattr(comparison, 'pegar_matriz_fechamento', lambda tickers: precos[list(tickers)])
+
+    resultado = comparison.comparar_tickers(('TCKR0.SA', 'TCKR2.SA'), '2023-01-03', '2023-01-10', 21, 'teste')
+    rebaseado = resultado['rebaseado']
+    assert list(rebaseado.columns) == ['TCKR0.SA', 'TCKR2.SA']
+    assert (rebaseado.index[0], rebaseado.index[-1]) == (pd.Timestamp('2023-01-03 03:00'), pd.Timestamp('2023-01-10 03:00'))
+
+
+def snapshot_acoes(quantidade=200, seed=2):
+    """Snapshot sintético no formato de gold_snapshot_stock_br, com métricas ausentes em algumas linhas."""
+    rng = np.random.default_rng(seed)
+    tabela = pd.DataFrame({
+        'ticker_br': [f'TCKR{i}' for i in range(quantidade)],
+        'setor': rng.choice(['Energia', 'Financeiro', 'Saúde', 'Varejo'], quantidade),
+        'industria': rng.choice(['A', 'B', 'C'], quantidade),
+        'classe_listagem': rng.choice(['Ações Ordinárias', 'Ações Preferenciais'], quantidade),
+        'retorno_21d': rng.normal(0, 0.1, quantidade),
+    })
+    tabela.loc[rng.random(quantidade) < 0.1, 'retorno_21d'] = np.nan
+    return tabela
+
+
+def test_screener_filtra_com_ou_no_campo_e_entre_campos():
+    tabela = snapshot_acoes()
+    screener = Screener(tabela)
+
+    posicoes = screener.filtrar(setor=['Energia', 'Saúde'], industria=['B'], classe_listagem=[])
+    referencia = tabela.index[tabela['setor'].isin(['Energia', 'Saúde']) & (tabela['industria'] == 'B')]
+    assert posicoes.tolist() == referencia.tolist()
+    assert len(screener.filtrar()) == len(tabela)
+    assert len(screener.filtrar(setor=['Inexistente'])) == 0
+    assert screener.valores('setor', posicoes) == ['Energia', 'Saúde']
+
+def test_screener_top_igual_a_ordenacao_do_pandas():
+    tabela = snapshot_acoes()
+    screener = Screener(tabela)
+    posicoes = screener.filtrar(setor=['Financeiro', 'Varejo'])
+    filtrada = tabela.iloc[posicoes].dropna(subset=['retorno_21d'])
+
+    maiores = screener.top(posicoes, 'retorno_21d', n=10)
+    assert maiores['ticker_br'].tolist() == filtrada.nlargest(10, 'retorno_21d')['ticker_br'].tolist()
+
+    menores = screener.top(posicoes, 'retorno_21d', n=10, crescente=True)
+    assert menores['ticker_br'].tolist() == filtrada.nsmallest(10, 'retorno_21d')['ticker_br'].tolist()
+
+    # Sem valores suficientes, devolve só as linhas com a métrica preenchida
+    assert len(screener.top(posicoes, 'retorno_21d', n=len(tabela))) == len(filtrada)
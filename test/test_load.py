@@ -1 +1,48 @@
-# DEV TEST
\ No newline at end of file
+# DEV TEST
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+import pytest
+
+# O diretório 3_load não é um pacote importável: carrega o módulo pelo caminho do arquivo
+caminho_modulo = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend', 'etl', '3_load', '__init__v1.py')
+spec = importlib.util.spec_from_file_location('load_v1', caminho_modulo)
+load_v1 = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_v1)
+
+
+def test_build_latest_snapshot_calcula_metricas_do_ultimo_pregao():
+    datas = pd.bdate_range('2024-01-02', periods=30) + pd.Timedelta(hours=3)
+    fechamento = 10 * 1.01 ** np.arange(30)
+    historico = pd.concat([
+        pd.DataFrame({'ticker': 'PETR4.SA', 'data': datas, 'fechamento': fechamento, 'volume': np.arange(30) * 100}),
+        pd.DataFrame({'ticker': 'VALE3.SA', 'data': datas[:5], 'fechamento': [60.0, 61.0, 59.0, 62.0, 63.0], 'volume': 1000}),
+    ]).sample(frac=1, random_state=0)
+    wallet = pd.DataFrame({
+        'ticker_br': ['PETR4.SA', 'VALE3.SA', 'ITUB4.SA'],
+        'snome': ['PETROBRAS', 'VALE', 'ITAU'],
+        'setor': ['Energia', 'Mineração', 'Financeiro'],
+        'industria': ['Petróleo', 'Minério', 'Bancos'],
+        'classe_listagem': ['Ações Preferenciais', 'Ações Ordinárias', 'Ações Preferenciais'],
+    })
+
+    snapshot = load_v1.build_latest_snapshot(wallet, historico).set_index('ticker_br')
+
+    petr = snapshot.loc['PETR4.SA']
+    assert petr['data'] == datas[-1]
+    assert petr['retorno_1d'] == pytest.approx(0.01)
+    assert petr['retorno_21d'] == pytest.approx(1.01 ** 21 - 1)
+    assert petr['retorno_periodo'] == pytest.approx(1.01 ** 29 - 1)
+    assert petr['volume_medio_21d'] == pytest.approx(np.arange(9, 30).mean() * 100)
+    assert petr['volatilidade_21d'] == pytest.approx(0, abs=1e-12)
+
+    # Histórico menor que a janela: sem retorno de 21 dias, demais métricas sobre o que existe
+    vale = snapshot.loc['VALE3.SA']
+    retornos = pd.Series([60.0, 61.0, 59.0, 62.0, 63.0]).pct_change()
+    assert np.isnan(vale['retorno_21d'])
+    assert vale['retorno_periodo'] == pytest.approx(63 / 60 - 1)
+    assert vale['volatilidade_21d'] == pytest.approx(retornos.std() * np.sqrt(252))
+
+    # Ticker da carteira sem histórico permanece no snapshot, sem métricas
+    assert snapshot.loc['ITUB4.SA', ['fechamento', 'retorno_1d']].isna().all()